@@ -8,19 +8,32 @@ Run:
     uvicorn backend.app:app --reload
     # OR via the installed CLI:
     polypi-serve
+
+Deploy (uvloop event loop + httptools parser, one worker per core):
+    uvicorn backend.app:app --loop uvloop --http httptools --workers $(nproc)
 """
 
 from __future__ import annotations
 
-import importlib.util
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import logging
+import multiprocessing
 import os
+import re
 import sys
+import threading
+import types
+from contextlib import asynccontextmanager
+from multiprocessing.managers import SyncManager
 from pathlib import Path
+from queue import Empty
 from typing import Any
 
 from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
@@ -33,11 +46,224 @@ if str(ROOT) not in sys.path:
 
 import dytx  # noqa: E402
 
+# Proof-of-work files, resolved once (checked for existence at startup)
+_PROOF_PATHS: dict[int, Path] = {
+    1: ROOT / "proof_of_work_1_hello.py",
+    2: ROOT / "proof_of_work_2_led_blink.py",
+    3: ROOT / "proof_of_work_3_web.py",
+    4: ROOT / "proof_of_work_4_graphics.py",
+}
+
+# ---------------------------------------------------------------------------
+# JSON encoding — orjson's C encoder when installed, stdlib json otherwise
+# ---------------------------------------------------------------------------
+try:
+    import orjson  # type: ignore[import]
+except ImportError:
+    orjson = None
+
+
+def _ndjson(obj: Any) -> bytes:
+    """Encode one newline-delimited JSON record."""
+    if orjson is None:
+        return json.dumps(obj).encode("utf-8") + b"\n"
+    return orjson.dumps(obj) + b"\n"
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (falls back to stdlib json)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content)
+
 # ---------------------------------------------------------------------------
 # Boot DYTX in pure mode
 # ---------------------------------------------------------------------------
 dytx.init(mode="python", ide="pure")
 
+# ---------------------------------------------------------------------------
+# Proof worker pool — proofs run off the event loop, one per core
+# ---------------------------------------------------------------------------
+PROOF_POOL: concurrent.futures.ProcessPoolExecutor | None = None
+_MANAGER: SyncManager | None = None  # owns the per-run output queues
+_PROOF_SLOTS: asyncio.Semaphore | None = None  # bounds proofs queued on the pool
+
+
+# Worker stdout batching: a batch goes out at this many lines or characters,
+# or after _SINK_INTERVAL seconds, whichever comes first
+_SINK_MAX_LINES = 256
+_SINK_MAX_CHARS = 16 * 1024
+_SINK_INTERVAL = 0.05   # seconds
+
+
+class _QueueSink:
+    """
+    Write-only stdout sink for a pool worker. Completed lines are batched and
+    forwarded to the (manager) queue as one list per put — every put is a
+    manager RPC, so a proof printing 20k lines must not cost 20k of them.
+    A batch is sent once it reaches _SINK_MAX_LINES lines or _SINK_MAX_CHARS
+    characters, and a ticker thread sends whatever is pending every
+    _SINK_INTERVAL seconds, so slow proofs (LED blink sleeps) still stream live.
+    """
+
+    __slots__ = ("queue", "partial", "pending", "size", "lock", "stop", "ticker")
+
+    def __init__(self, queue: Any) -> None:
+        self.queue = queue
+        self.partial: list[str] = []
+        self.pending: list[str] = []
+        self.size = 0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.ticker = threading.Thread(target=self._tick, daemon=True)
+        self.ticker.start()
+
+    def _send(self) -> None:
+        """Forward the pending batch (caller holds the lock)."""
+        if self.pending:
+            self.queue.put(self.pending)
+            self.pending = []
+            self.size = 0
+
+    def _tick(self) -> None:
+        while not self.stop.wait(_SINK_INTERVAL):
+            with self.lock:
+                self._send()
+
+    def write(self, s: str) -> int:
+        if "\n" in s:
+            self.partial.append(s)
+            *lines, rest = "".join(self.partial).split("\n")
+            self.partial = [rest] if rest else []
+            with self.lock:
+                self.pending.extend(lines)
+                self.size += len(s)
+                if len(self.pending) >= _SINK_MAX_LINES or self.size >= _SINK_MAX_CHARS:
+                    self._send()
+        elif s:
+            self.partial.append(s)
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Stop the ticker and forward everything left, including unterminated text."""
+        self.stop.set()
+        self.ticker.join()
+        with self.lock:
+            if self.partial:
+                self.pending.append("".join(self.partial))
+                self.partial = []
+            self._send()
+
+
+
+# Per-worker proof sources (read once by the parent) and their compiled code
+_PROOF_SOURCES: dict[int, tuple[str, bytes]] = {}
+_PROOF_CODE: dict[int, types.CodeType] = {}
+
+
+def _proof_code(proof_id: int) -> types.CodeType:
+    """Return the compiled code object for a proof, compiling it on first use."""
+    code = _PROOF_CODE.get(proof_id)
+    if code is None:
+        path, source = _PROOF_SOURCES[proof_id]
+        code = _PROOF_CODE[proof_id] = compile(source, path, "exec")
+    return code
+
+
+def _worker_init(sources: dict[int, tuple[str, bytes]]) -> None:
+    """
+    Pool initializer: boot DYTX in pure mode once per worker process and
+    compile every proof from the in-memory sources the parent broadcast —
+    workers never touch the proof files on disk.
+    """
+    dytx.init(mode="python", ide="pure")
+    _PROOF_SOURCES.update(sources)
+    for proof_id in sources:
+        try:
+            _proof_code(proof_id)
+        except SyntaxError:
+            pass  # reported by _worker_run when that proof is requested
+
+
+def _worker_run(proof_id: int, path: str, queue: Any) -> str | None:
+    """
+    Execute a proof-of-work in a pool worker, streaming its stdout lines to
+    `queue` and finishing with a None sentinel.
+    Returns the error message, or None when the proof completed.
+    """
+    sink = _QueueSink(queue)
+    try:
+        with contextlib.redirect_stdout(sink):
+            code = _proof_code(proof_id)
+            exec(code, {"__name__": f"pow_{proof_id}", "__file__": path})
+    except Exception as exc:
+        return str(exc)
+    finally:
+        sink.close()
+        queue.put(None)
+    return None
+
+
+def _queue_get(queue: Any) -> tuple[list[str], bool] | bool:
+    """
+    Blocking queue read for a thread: wait for the first batch, then drain
+    every batch already queued, so the event loop pays one thread hop for all
+    of them. Returns (lines, finished) — finished once the None sentinel was
+    read — or False for 'nothing yet, check again'.
+    """
+    try:
+        item = queue.get(timeout=0.5)
+    except Empty:
+        return False
+    lines: list[str] = []
+    while item is not None:
+        lines.extend(item)
+        try:
+            item = queue.get_nowait()
+        except Empty:
+            return lines, False
+    return lines, True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the proof worker pool on startup and tear it down on shutdown."""
+    global PROOF_POOL, _MANAGER, _PROOF_SLOTS
+    # DYTX logs its init/reset banners at INFO; DYTX_LOG=info to see them.
+    # Only the "dytx" logger is configured — the root logger stays the host's.
+    dytx_log = logging.getLogger("dytx")
+    dytx_log.setLevel(os.environ.get("DYTX_LOG", "WARNING").upper())
+    if not dytx_log.handlers:
+        dytx_log.addHandler(logging.StreamHandler())
+        dytx_log.propagate = False   # own handler: no duplicate via a root handler
+    missing = [str(p) for p in _PROOF_PATHS.values() if not p.is_file()]
+    if missing:
+        raise RuntimeError(f"Proof-of-work file(s) not found: {', '.join(missing)}")
+    # Read each proof once here; `uvicorn --reload` restarts us on edits
+    sources = {i: (str(p), p.read_bytes()) for i, p in _PROOF_PATHS.items()}
+    workers = os.cpu_count() or 1
+    PROOF_POOL = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_worker_init,
+        initargs=(sources,),
+    )
+    _MANAGER = multiprocessing.Manager()
+    _PROOF_SLOTS = asyncio.Semaphore(workers * 2)
+    try:
+        yield
+    finally:
+        PROOF_POOL.shutdown(wait=False, cancel_futures=True)
+        PROOF_POOL = None
+        _MANAGER.shutdown()
+        _MANAGER = None
+        _PROOF_SLOTS = None
+
+
 # ---------------------------------------------------------------------------
 # FastAPI application
 # ---------------------------------------------------------------------------
@@ -47,23 +273,116 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# CORS — allow the dev frontend (Vite / live-server) to hit the API
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS — allow the dev frontend (Vite / live-server) to hit the API.
+# Raw ASGI wrapper: only /api/* responses get the fixed headers, everything
+# else (dashboard, static assets) passes straight through untouched.
+_CORS_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+    (b"access-control-allow-headers", b"*"),
+]
+_CORS_PREFLIGHT = {
+    "type": "http.response.start",
+    "status": 204,
+    "headers": [*_CORS_HEADERS, (b"access-control-max-age", b"600")],
+}
+
+
+class ApiCORSMiddleware:
+    """Append precomputed CORS headers to /api/* responses and answer preflights."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api"):
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            await send(_CORS_PREFLIGHT)
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *_CORS_HEADERS]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+app.add_middleware(ApiCORSMiddleware)
 
 # ---------------------------------------------------------------------------
 # Static files — serve frontend/dist if it exists
 # ---------------------------------------------------------------------------
 FRONTEND_DIST = ROOT / "frontend" / "dist"
+
+# Content-hashed build assets never change:
+#  - everything Vite/Rollup emits into dist/assets/ carries a content hash,
+#    base64url as well as hex (index-BvFq2Kx1.js, app-5e8d0c47.css);
+#  - elsewhere, a hex hash in the name (webpack-style app.3f9c2a1b.js).
+# The hex test stays narrow so names like 'my-component.js' are not caught.
+_ASSETS_DIR = os.path.join(os.path.realpath(FRONTEND_DIST / "assets"), "")
+_has_hex_hash = re.compile(r"[.-][0-9a-f]{8,}\.[^/\\]+$", re.ASCII).search
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _is_hashed_asset(full_path: str) -> bool:
+    """True for a build output whose name changes whenever its content does."""
+    return full_path.startswith(_ASSETS_DIR) or _has_hex_hash(os.path.basename(full_path)) is not None
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks content-hashed assets as immutable for a year."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        # Starlette answers a matching If-None-Match / If-Modified-Since with a
+        # 304 before the file is opened; we only add the caching policy.
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if _is_hashed_asset(full_path):
+            response.headers["cache-control"] = _IMMUTABLE
+        return response
+
+
 if FRONTEND_DIST.is_dir():
-    app.mount("/", StaticFiles(directory=str(FRONTEND_DIST), html=True), name="frontend")
+    app.mount("/", CachedStaticFiles(directory=str(FRONTEND_DIST), html=True), name="frontend")
+
+
+# ---------------------------------------------------------------------------
+# Static responses — built once at import, served as-is
+# ---------------------------------------------------------------------------
+_FALLBACK_HTML = """
+<!DOCTYPE html><html lang="en">
+<head><meta charset="UTF-8"><title>PolyPi Pure</title>
+<style>body{font-family:monospace;background:#0d1117;color:#58a6ff;padding:2rem;}
+h1{color:#f0883e;}a{color:#58a6ff;}</style></head>
+<body>
+<h1>PolyPi Pure v1.0</h1>
+<p>Backend is running. Frontend not yet built.</p>
+<p>→ <a href="/api/docs">Swagger UI</a></p>
+<p>→ <a href="/api/redoc">ReDoc</a></p>
+<p>→ <a href="/api/health">Health check</a></p>
+<p>→ <a href="/api/runtime">Runtime info</a></p>
+<p>→ <a href="/api/proofs">Proofs list</a></p>
+</body></html>
+"""
+
+_INDEX_PATH = ROOT / "frontend" / "index.html"
+_INDEX_HTML = _INDEX_PATH.read_text(encoding="utf-8") if _INDEX_PATH.is_file() else _FALLBACK_HTML
+_INDEX_BYTES = _INDEX_HTML.encode("utf-8")
+
+_PROOFS_LIST = [
+    {"id": 1, "name": "Hello World",    "file": "proof_of_work_1_hello.py"},
+    {"id": 2, "name": "LED Blink",      "file": "proof_of_work_2_led_blink.py"},
+    {"id": 3, "name": "Web Output",     "file": "proof_of_work_3_web.py"},
+    {"id": 4, "name": "3D Graphics",    "file": "proof_of_work_4_graphics.py"},
+]
 
 
 # ---------------------------------------------------------------------------
@@ -84,19 +403,19 @@ class RunPoWRequest(BaseModel):
 # ---------------------------------------------------------------------------
 
 @app.get("/api/health")
-def health() -> dict:
+async def health() -> dict:
     """Liveness check."""
     return {"status": "ok", "service": "polypi-pure-backend"}
 
 
 @app.get("/api/runtime", response_model=dict)
-def get_runtime() -> dict:
+async def get_runtime() -> dict:
     """Return current DYTX runtime status."""
     return dytx.get_runtime_info()
 
 
 @app.post("/api/runtime/init")
-def reinit_runtime(req: DytxInitRequest) -> dict:
+async def reinit_runtime(req: DytxInitRequest) -> dict:
     """Re-initialise DYTX with the supplied parameters."""
     dytx.reset()
     try:
@@ -107,76 +426,61 @@ def reinit_runtime(req: DytxInitRequest) -> dict:
 
 
 @app.get("/api/proofs")
-def list_proofs() -> list:
+async def list_proofs() -> list:
     """List all available proof-of-work modules."""
-    return [
-        {"id": 1, "name": "Hello World",    "file": "proof_of_work_1_hello.py"},
-        {"id": 2, "name": "LED Blink",      "file": "proof_of_work_2_led_blink.py"},
-        {"id": 3, "name": "Web Output",     "file": "proof_of_work_3_web.py"},
-        {"id": 4, "name": "3D Graphics",    "file": "proof_of_work_4_graphics.py"},
-    ]
+    return _PROOFS_LIST
 
 
 @app.post("/api/proofs/run")
-def run_proof(req: RunPoWRequest) -> JSONResponse:
+async def run_proof(req: RunPoWRequest) -> StreamingResponse:
     """
-    Execute a proof-of-work module in-process (pure Python simulation).
-    Returns stdout lines captured during execution.
+    Execute a proof-of-work module in a worker process (pure Python simulation).
+    Streams newline-delimited JSON as the proof prints:
+        {"line": "..."}                               one per stdout line
+        {"done": true, "proof": n, "error": null}     final record
     """
-    files = {
-        1: ROOT / "proof_of_work_1_hello.py",
-        2: ROOT / "proof_of_work_2_led_blink.py",
-        3: ROOT / "proof_of_work_3_web.py",
-        4: ROOT / "proof_of_work_4_graphics.py",
-    }
-    if req.proof not in files:
+    path = _PROOF_PATHS.get(req.proof)
+    if path is None:
         raise HTTPException(status_code=404, detail=f"Proof #{req.proof} not found.")
 
-    import io, contextlib  # noqa: E401
-
-    buf = io.StringIO()
-    try:
-        with contextlib.redirect_stdout(buf):
-            # Re-init for each run in pure mode
-            dytx.reset()
-            dytx.init(mode="python", ide="pure")
-            spec = importlib.util.spec_from_file_location(
-                f"pow_{req.proof}", str(files[req.proof])
-            )
-            mod = importlib.util.module_from_spec(spec)  # type: ignore[arg-type]
-            spec.loader.exec_module(mod)  # type: ignore[union-attr]
-    except Exception as exc:
-        return JSONResponse(
-            status_code=500,
-            content={"proof": req.proof, "error": str(exc), "output": buf.getvalue()},
-        )
-
-    return JSONResponse(
-        content={"proof": req.proof, "output": buf.getvalue()}
-    )
+    async def stream():
+        loop = asyncio.get_running_loop()
+        async with _PROOF_SLOTS:
+            queue = _MANAGER.Queue()
+            future = loop.run_in_executor(PROOF_POOL, _worker_run, req.proof, str(path), queue)
+            while True:
+                got = await loop.run_in_executor(None, _queue_get, queue)
+                if got is False:
+                    # Worker died or the pool cancelled the run before the sentinel
+                    # (cancelled() first: exception() raises on a cancelled future)
+                    if future.done() and (future.cancelled() or future.exception() is not None):
+                        break
+                    continue
+                lines, finished = got
+                if lines:
+                    # One chunk per drained batch, not one ASGI send per line
+                    yield b"".join([_ndjson({"line": line}) for line in lines])
+                if finished:
+                    break
+            try:
+                # shield(): a client disconnect cancels this await, not the run,
+                # so future.cancelled() below means the pool cancelled it
+                err = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                err = "Proof run cancelled (worker pool shut down)."
+            except Exception as exc:
+                err = str(exc) or type(exc).__name__
+        yield _ndjson({"done": True, "proof": req.proof, "error": err})
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.get("/", response_class=HTMLResponse, include_in_schema=False)
-def root() -> str:
-    """Fallback index when frontend/dist is not built yet."""
-    html_path = ROOT / "frontend" / "index.html"
-    if html_path.is_file():
-        return html_path.read_text(encoding="utf-8")
-    return """
-<!DOCTYPE html><html lang="en">
-<head><meta charset="UTF-8"><title>PolyPi Pure</title>
-<style>body{font-family:monospace;background:#0d1117;color:#58a6ff;padding:2rem;}
-h1{color:#f0883e;}a{color:#58a6ff;}</style></head>
-<body>
-<h1>PolyPi Pure v1.0</h1>
-<p>Backend is running. Frontend not yet built.</p>
-<p>→ <a href="/api/docs">Swagger UI</a></p>
-<p>→ <a href="/api/redoc">ReDoc</a></p>
-<p>→ <a href="/api/health">Health check</a></p>
-<p>→ <a href="/api/runtime">Runtime info</a></p>
-<p>→ <a href="/api/proofs">Proofs list</a></p>
-</body></html>
-    """
+async def root() -> Response:
+    """Dashboard index (or the fallback page when frontend/ is missing)."""
+    return Response(content=_INDEX_BYTES, media_type="text/html")
 
 
 # ---------------------------------------------------------------------------
@@ -186,11 +490,26 @@ h1{color:#f0883e;}a{color:#58a6ff;}</style></head>
 def start() -> None:
     """Entry point for `polypi-serve` console script."""
     import uvicorn  # type: ignore[import]
+
+    # Pin the fast event loop / HTTP parser when available (not on Windows)
+    try:
+        import uvloop  # type: ignore[import]  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # type: ignore[import]  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
     uvicorn.run(
         "backend.app:app",
         host="0.0.0.0",
         port=8000,
         reload=False,
+        loop=loop,
+        http=http,
     )
 
 
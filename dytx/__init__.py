@@ -10,17 +10,62 @@ __version__ = "2.1.0"
 __author__ = "PolyPy / chuckyLeeVIII"
 __license__ = "MIT"
 
+import sys
+
+try:
+    from threading import Lock as _Lock
+except ImportError:  # MicroPython: threading lives in _thread
+    from _thread import allocate_lock as _Lock
+
+try:
+    import logging
+    _log = logging.getLogger("dytx")
+except ImportError:  # MicroPython without micropython-lib's logging
+    class _log:
+        @staticmethod
+        def info(msg, *args):
+            pass
+
+try:
+    from os import getenv as _getenv
+except ImportError:  # MicroPython: no environment variables
+    def _getenv(name, default=None):
+        return default
+
+
+# ── Environment detection ────────────────────────────────────────────────────
+# Computed once at import; scripts pass these to init() instead of each
+# re-deriving them from sys.executable
+_IDE = "thonny" if "thonny" in (getattr(sys, "executable", "") or "").lower() else "pure"
+_MODE = "micropython" if _IDE == "thonny" else "python"
+
+
 # ── Runtime state ────────────────────────────────────────────────────────────
-_mode = None        # 'micropython' | 'python'
-_ide = None         # 'thonny' | 'pure' (pure = standard CPython / fullstack)
-_target = None      # board identifier string
-_initialized = False
-_runtime_log = []   # ordered log of every init call this session
+class _State:
+    """Mutable runtime configuration — one instance, updated in place under _lock."""
+
+    __slots__ = ("mode", "ide", "target", "initialized", "init_calls", "verbose")
+
+    def __init__(self):
+        self.mode = None            # 'micropython' | 'python'
+        self.ide = None             # 'thonny' | 'pure' (pure = standard CPython / fullstack)
+        self.target = None          # board identifier string
+        self.initialized = False
+        self.init_calls = 0         # number of init() calls this session
+        self.verbose = _getenv("DYTX_QUIET", "") in ("", "0")   # sub-engine progress output
+
+
+_state = _State()
+_lock = _Lock()
 
-# Supported values
-_VALID_MODES = ('micropython', 'python')
-_VALID_IDES = ('thonny', 'pure')           # 'pure' = CPython / fullstack / FastAPI
-_VALID_TARGETS = ('rp2040', 'generic', 'esp32', 'esp8266', 'stm32', 'avr', 'nrf52', None)
+# Supported values — ordered tuples for user-facing messages,
+# frozensets for init() validation (a single hash lookup)
+_VALID_MODES_ORDERED = ('micropython', 'python')
+_VALID_IDES_ORDERED = ('thonny', 'pure')              # 'pure' = CPython / fullstack / FastAPI
+_VALID_TARGETS_ORDERED = ('rp2040', 'generic', 'esp32', 'esp8266', 'stm32', 'avr', 'nrf52')  # or None
+_VALID_MODES = frozenset(_VALID_MODES_ORDERED)
+_VALID_IDES = frozenset(_VALID_IDES_ORDERED)
+_VALID_TARGETS = frozenset(_VALID_TARGETS_ORDERED)
 
 # ── Core init ────────────────────────────────────────────────────────────────
 def init(mode="micropython", ide="thonny", target=None):
@@ -34,8 +79,6 @@ def init(mode="micropython", ide="thonny", target=None):
         target : 'rp2040' | 'generic' | 'esp32' | 'esp8266' |
                  'stm32' | 'avr' | 'nrf52' | None
     """
-    global _mode, _ide, _target, _initialized, _runtime_log
-
     if ide not in _VALID_IDES:
         raise RuntimeError(
             f"[DYTX] ERROR: Invalid ide '{ide}'. "
@@ -43,24 +86,73 @@ def init(mode="micropython", ide="thonny", target=None):
         )
 
     if mode not in _VALID_MODES:
-        raise ValueError(f"[DYTX] ERROR: Invalid mode '{mode}'.")
+        raise ValueError(f"[DYTX] ERROR: Invalid mode '{mode}'. Choose from {_VALID_MODES_ORDERED}.")
 
     if target is not None and target not in _VALID_TARGETS:
-        raise ValueError(f"[DYTX] ERROR: Unknown target '{target}'.")
+        raise ValueError(
+            f"[DYTX] ERROR: Unknown target '{target}'. Choose from {_VALID_TARGETS_ORDERED} or None."
+        )
 
-    _mode = mode
-    _ide = ide
-    _target = target
-    _initialized = True
+    with _lock:
+        _state.mode = mode
+        _state.ide = ide
+        _state.target = target
+        _state.initialized = True
+        _state.init_calls += 1
+
+    _log.info("[DYTX] Runtime initialised | mode=%s | ide=%s | target=%s", mode, ide, target)
+    _log.info("[DYTX] Sub-modules ready | machine | binary | firmware | web | asm")
+
+
+def _iter_lines(text):
+    """Yield the lines of text one at a time (no intermediate list, unlike splitlines())."""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end < 0:
+            if start < len(text):
+                yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+# ── Output control ───────────────────────────────────────────────────────────
+# Three independent switches, each for one kind of output:
+#   _state.verbose    set_verbose() / DYTX_QUIET=1 — suppresses all sub-engine
+#                     progress output: compiled/wrote/register-write lines and
+#                     the asm/binary per-directive echo (formatted lazily via _emit).
+#   set_quiet()       asm/binary only, while verbose — defers the per-directive
+#                     echo and writes it in one stdout write at flush()/report().
+#   logging "dytx"    the init()/reset() runtime banners only (INFO level);
+#                     configure with the logging module (backend: DYTX_LOG).
+# Warnings, errors and explicit report()/dump_*()/status() output always print.
+def set_verbose(enabled=True):
+    """
+    Enable/disable sub-engine progress output (compiled/wrote/register-write
+    lines and the asm/binary per-directive echo) — see "Output control" above.
+    Warnings, errors and explicit report()/dump_*() output are always printed.
+    Starts disabled when the DYTX_QUIET environment variable is set (and not '0').
+    """
+    _state.verbose = bool(enabled)
 
-    _runtime_log.append({"mode": mode, "ide": ide, "target": target})
-    print(f"[DYTX] Runtime initialised | mode={mode} | ide={ide} | target={target}")
-    print("[DYTX] Sub-modules ready | machine | binary | firmware | web | asm")
+
+def _emit(prefix, fmt, *args):
+    """
+    Print one sub-engine progress line, '%'-formatting args only when output
+    is enabled — a quiet session pays one attribute check per message.
+    """
+    if _state.verbose:
+        print(prefix, fmt % args if args else fmt)
 
 
 def _check_init():
-    """Raise if dytx.init() has not been called yet."""
-    if not _initialized:
+    """
+    Raise if dytx.init() has not been called yet.
+    Sub-engines guard with `if not _state.initialized:` and only call this to
+    raise, so the initialised path costs an attribute load, not a call.
+    """
+    if not _state.initialized:
         raise RuntimeError("[DYTX] ERROR: dytx.init() must be called first.")
 
 
@@ -70,54 +162,65 @@ def status():
     print("=" * 52)
     print(" DYTX Runtime Status")
     print("=" * 52)
-    print(f"  initialised : {_initialized}")
-    print(f"  mode        : {_mode}")
-    print(f"  ide         : {_ide}")
-    print(f"  target      : {_target}")
-    print(f"  init calls  : {len(_runtime_log)}")
+    print(f"  initialised : {_state.initialized}")
+    print(f"  mode        : {_state.mode}")
+    print(f"  ide         : {_state.ide}")
+    print(f"  target      : {_state.target}")
+    print(f"  init calls  : {_state.init_calls}")
     print("=" * 52)
 
 
 def get_runtime_info() -> dict:
     """Return the current runtime configuration as a dict."""
-    return {
-        "version": __version__,
-        "initialised": _initialized,
-        "mode": _mode,
-        "ide": _ide,
-        "target": _target,
-        "init_calls": len(_runtime_log),
-    }
+    with _lock:
+        return {
+            "version": __version__,
+            "initialised": _state.initialized,
+            "mode": _state.mode,
+            "ide": _state.ide,
+            "target": _state.target,
+            "init_calls": _state.init_calls,
+        }
 
 
 def reset():
     """Reset the DYTX runtime state (useful in test harnesses)."""
-    global _mode, _ide, _target, _initialized, _runtime_log
-    _mode = None
-    _ide = None
-    _target = None
-    _initialized = False
-    _runtime_log = []
-    print("[DYTX] Runtime reset.")
+    with _lock:
+        _state.mode = None
+        _state.ide = None
+        _state.target = None
+        _state.initialized = False
+        _state.init_calls = 0
+    _log.info("[DYTX] Runtime reset.")
 
 
 # ── Sub-module imports ────────────────────────────────────────────────────────
-# Lazy-loaded for MicroPython compatibility
-try:
-    from dytx import machine, binary, firmware, web, asm
-except ImportError:
-    pass
+# Lazy-loaded (PEP 562): a sub-engine is imported on first attribute access,
+# so `import dytx; dytx.init()` never pays for the ones a script doesn't use.
+_SUBMODULES = ('machine', 'binary', 'firmware', 'web', 'asm')
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        __import__('dytx.' + name)   # binds the sub-module into this namespace
+        return globals()[name]
+    raise AttributeError(f"module 'dytx' has no attribute '{name}'")
 
 
 def report_all():
-    """Print a full session report across ALL DYTX sub-engines."""
-    print(" " + "=" * 52)
+    """
+    Print a full session report across the DYTX sub-engines in use.
+    Only sub-engines that are already imported are reported: an unused one has
+    nothing to report, and touching it here would defeat the lazy import.
+    """
+    print("\n" + "=" * 52)
     print(" DYTX Full Session Report")
     print("=" * 52)
-    for module in (machine, binary, firmware, web, asm):
-        if hasattr(module, 'report'):
+    for name in _SUBMODULES:
+        module = sys.modules.get('dytx.' + name)
+        if module is not None:
             module.report()
-    print("=" * 52 + " ")
+    print("=" * 52 + "\n")
 
 
 __all__ = [
@@ -126,6 +229,7 @@ __all__ = [
     "status",
     "get_runtime_info",
     "report_all",
+    "set_verbose",
     "machine",
     "binary",
     "firmware",
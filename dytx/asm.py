@@ -5,18 +5,29 @@
 # MicroPython @micropython.asm_thumb decorator integration ready
 
 import re
-from dytx import _check_init
+import sys
+from collections import deque
+from dytx import _state, _check_init, _emit
 
 # ── State ─────────────────────────────────────────────────────────────────────
 _buffer = []
 _exec_count = 0
-_history = []  # list of (instruction_str, timestamp) tuples
+# Executed instructions, oldest evicted first: bounded so long sessions on
+# small-RAM boards (264 KB on the RP2040) cannot grow it without limit.
+# (positional maxlen: MicroPython's deque takes no keyword arguments)
+_HISTORY_LIMIT = 1024
+_history = deque((), _HISTORY_LIMIT)
 _architecture = 'thumb'  # 'thumb' | 'armv6m' | 'armv7m' | 'armv8m'
+_VALID_ARCHS_ORDERED = ('thumb', 'armv6m', 'armv7m', 'armv8m')   # for error messages
+_VALID_ARCHS = frozenset(_VALID_ARCHS_ORDERED)
+_quiet = False      # True: per-directive echo lines are held until flush()/report() (see dytx output control)
+_quiet_lines = []
+_PREFIX = "[DYTX:asm]"   # per-directive output: print(_PREFIX, ...) joins in C, no f-string build
 
-_ASM_TAG = re.compile(r"#\s*#asm:\s*(.+)")
+_ASM_TAG = re.compile(r"#\s*#asm:\s*(.+)", getattr(re, 'ASCII', 0))
 
 # Instruction validation sets (basic opcode checks)
-_THUMB_OPCODES = {
+_THUMB_OPCODES = frozenset({
     'mov', 'movs', 'movw', 'movt', 'mvn', 'mvns',
     'add', 'adds', 'adc', 'adcs', 'sub', 'subs', 'sbc', 'sbcs', 'rsb', 'rsbs',
     'mul', 'muls', 'mla', 'mls', 'umull', 'smull', 'udiv', 'sdiv',
@@ -36,25 +47,73 @@ _THUMB_OPCODES = {
     'sxtb', 'sxth', 'uxtb', 'uxth',
     'it', 'ite', 'itt', 'itee', 'itet', 'itte', 'ittt',
     'cbz', 'cbnz', 'tbb', 'tbh',
-}
+})
 
 
-def _parse(line):
+def _parse(line, _match=_ASM_TAG.match):
     """Extract assembly instruction from a comment line."""
-    m = _ASM_TAG.match(line.strip())
+    if '#asm:' not in line:   # cheap reject before the regex engine
+        return None
+    m = _match(line) or _match(line.strip())
     return m.group(1).strip() if m else None
 
 
+def _parse_many(lines, _match=_ASM_TAG.match):
+    """Yield the assembly instruction of every #asm: line in an iterable of lines."""
+    for line in lines:
+        if '#asm:' not in line:
+            continue
+        m = _match(line) or _match(line.strip())
+        if m:
+            yield m.group(1).strip()
+
+
+# Whole-source scanner: one finditer() pass over the text instead of a _parse()
+# call per line (None on MicroPython, whose re lacks MULTILINE and finditer)
+try:
+    _ASM_SCAN = re.compile(r"^[ \t]*#[ \t]*#asm:[ \t]*([^\n]+)", re.ASCII | re.MULTILINE)
+except AttributeError:
+    _ASM_SCAN = None
+
+
+def scan_source(text):
+    """
+    Yield the instruction of every #asm: directive in a source string.
+
+    Args:
+        text : full source text (e.g. the contents of a .py file)
+    """
+    if _ASM_SCAN is None:
+        for instruction in _parse_many(text.splitlines()):
+            if instruction:
+                yield instruction
+        return
+    for m in _ASM_SCAN.finditer(text):
+        instruction = m.group(1).strip()
+        if instruction:
+            yield instruction
+
+
+# Validation warning templates — formatted with the opcode only by a caller that reports them
+_ERR_EMPTY = "Empty instruction"
+_ERR_UNKNOWN_OPCODE = "Unknown opcode '{}'"
+
+
 def _validate_instruction(instruction):
     """
     Basic syntax validation: check if the opcode (first token) is a known Thumb instruction.
     Returns (is_valid: bool, opcode: str, warning: str | None)
+    where warning is one of the _ERR_* templates (use warning.format(opcode)).
     """
-    tokens = instruction.lower().split()
+    # Opcode = first whitespace-separated token; maxsplit=1 leaves the operands
+    # unsplit (any str.isspace() character separates, as with split())
+    tokens = instruction.split(None, 1)
     if not tokens:
-        return False, None, "Empty instruction"
+        return False, None, _ERR_EMPTY
 
-    opcode = tokens[0].rstrip(':')
+    opcode = tokens[0].lower()
+    if opcode[-1] == ':':
+        opcode = opcode.rstrip(':')
 
     # Strip conditional suffix (e.g. 'beq' → base 'b', 'movs' → base 'mov')
     # (simplified: just check membership in the big set)
@@ -66,7 +125,7 @@ def _validate_instruction(instruction):
         return True, 'label', None
 
     # Unknown opcode
-    return False, opcode, f"Unknown opcode '{opcode}'"
+    return False, opcode, _ERR_UNKNOWN_OPCODE
 
 
 def set_architecture(arch):
@@ -79,11 +138,10 @@ def set_architecture(arch):
     Note: Advanced validation & feature-gating can be added per-arch in future.
     """
     global _architecture
-    valid_archs = ('thumb', 'armv6m', 'armv7m', 'armv8m')
-    if arch not in valid_archs:
-        raise ValueError(f"[DYTX:asm] Unsupported architecture '{arch}'. Choose from {valid_archs}.")
+    if arch not in _VALID_ARCHS:
+        raise ValueError(f"[DYTX:asm] Unsupported architecture '{arch}'. Choose from {_VALID_ARCHS_ORDERED}.")
     _architecture = arch
-    print(f"[DYTX:asm] Architecture set to '{arch}'")
+    _emit(_PREFIX, "Architecture set to '%s'", arch)
 
 
 def get_architecture():
@@ -91,18 +149,48 @@ def get_architecture():
     return _architecture
 
 
-def flush():
+def set_quiet(value=True):
+    """
+    Enable/disable quiet mode.
+    When quiet, exec_directive() does not print per instruction; the echo lines
+    are held in memory and written in a single stdout write at flush()/report()
+    (each print() on a serial console blocks, so this is one write instead of N).
+    This defers output; dytx.set_verbose(False) / DYTX_QUIET suppresses it.
+    """
+    global _quiet
+    _quiet = bool(value)
+    if not _quiet:
+        _drain_quiet()
+
+
+def _drain_quiet():
+    """Write held quiet-mode lines to stdout in one call."""
+    if _quiet_lines:
+        sys.stdout.write("\n".join(_quiet_lines) + "\n")
+        _quiet_lines.clear()
+
+
+def flush(source=None):
     """
     Flush the assembly instruction buffer.
     In Thonny + MicroPython, DYTX intercepts preceding #asm: comments
     and dispatches them to the ASM sub-engine before this call returns.
+
+    Args:
+        source : optional source text; its #asm: directives (via scan_source)
+                 are queued into the buffer before flushing
     """
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
+    if source is not None:
+        _buffer.extend(scan_source(source))
     count = len(_buffer)
     _exec_count += count
+    _history.extend(_buffer)
+    _drain_quiet()
     if count:
-        print(f"[DYTX:asm] Executed {count} ASM directive{'s' if count != 1 else ''} OK")
+        _emit(_PREFIX, "Executed %d ASM directive%s OK", count, 's' if count != 1 else '')
     _buffer.clear()
 
 
@@ -114,19 +202,33 @@ def exec_directive(instruction, validate=True):
         instruction : assembly instruction string (e.g. 'mov r0, #42')
         validate    : if True, perform basic opcode validation
     """
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
 
     if validate:
         valid, opcode, warning = _validate_instruction(instruction)
         if not valid:
-            print(f"[DYTX:asm] WARNING: {warning} in '{instruction}'")
+            print(f"[DYTX:asm] WARNING: {warning.format(opcode)} in '{instruction}'")
 
-    _buffer.append(instruction)
     _history.append(instruction)
     _exec_count += 1
-    print(f"[DYTX:asm] >> {instruction}")
-    _buffer.clear()
+    if _state.verbose:
+        if _quiet:
+            _quiet_lines.append(_PREFIX + " >> " + instruction)
+        else:
+            print(_PREFIX, ">>", instruction)
+
+
+def queue(instruction):
+    """
+    Queue an assembly instruction for the next flush() without executing or
+    printing it (used by batch scanners; flush() consumes the queue).
+
+    Args:
+        instruction : assembly instruction string
+    """
+    _buffer.append(instruction)
 
 
 def exec_block(instructions, validate=True):
@@ -137,21 +239,39 @@ def exec_block(instructions, validate=True):
         instructions : iterable of instruction strings
         validate     : if True, validate each instruction
     """
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     for instr in instructions:
         exec_directive(instr.strip(), validate=validate)
 
 
 def get_history():
     """
-    Return a list of all assembly instructions executed this session.
+    Return a list of the assembly instructions executed this session
+    (the most recent set_history_limit() entries, oldest first).
     Useful for debugging and session replay.
     """
     return list(_history)
 
 
+def set_history_limit(n):
+    """
+    Set how many executed instructions get_history() keeps (default 1024).
+    The most recent min(n, current) entries are carried over.
+
+    Args:
+        n : maximum history length (positive int)
+    """
+    global _history, _HISTORY_LIMIT
+    if n < 1:
+        raise ValueError(f"[DYTX:asm] History limit must be >= 1, got {n}.")
+    _HISTORY_LIMIT = n
+    _history = deque(list(_history)[-n:], n)
+
+
 def report():
     """Print assembly execution session summary."""
+    _drain_quiet()
     print(f"[DYTX:asm] Session report: {_exec_count} ASM directive(s) executed. | arch={_architecture}")
 
 
@@ -159,9 +279,10 @@ def reset():
     """Reset ASM engine state (clears buffer, history, exec count)."""
     global _buffer, _exec_count, _history
     _buffer.clear()
-    _history.clear()
+    _history = deque((), _HISTORY_LIMIT)
+    _quiet_lines.clear()
     _exec_count = 0
-    print("[DYTX:asm] Reset complete.")
+    _emit(_PREFIX, "Reset complete.")
 
 
 # ── MicroPython @micropython.asm_thumb integration helpers ────────────────────────────
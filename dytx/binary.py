@@ -4,27 +4,89 @@
 # Supports binary string parsing, conversion utilities, and endianness control.
 
 import re
-from dytx import _check_init
+import sys
+from dytx import _state, _check_init, _emit
 
 # ── State ───────────────────────────────────────────────────────────────────────
-_buffer = {}
+_buffer = {}   # {label: (clean_bits, int_value)} — cleaned and parsed once at insertion
 _exec_count = 0
-_BINARY_TAG = re.compile(r"#\s*#binary:\s*([01\s]+)(?::\s*(.+))?")
+# re.ASCII: byte-class \s matching (MicroPython's re has no flags → 0)
+_BINARY_TAG = re.compile(r"#\s*#binary:\s*([01\s]+)(?::\s*(.+))?", getattr(re, 'ASCII', 0))
 
 # Endianness setting
 _endianness = 'big'  # 'big' | 'little'
 
+# Quiet mode: per-directive echo lines are held until flush()/report()
+_quiet = False
+_quiet_lines = []
+_PREFIX = "[DYTX:binary]"   # per-directive output: print(_PREFIX, ...) joins in C, no f-string build
 
-def _parse(line):
+# Whitespace removal for binary strings: one C-level translate() pass
+try:
+    _WS_DROP = str.maketrans('', '', ' \t\n\r')
+
+    def _clean(bits_str):
+        """Strip all whitespace from a binary string."""
+        return bits_str.translate(_WS_DROP)
+except AttributeError:  # MicroPython: no str.maketrans / str.translate
+    def _clean(bits_str):
+        """Strip all whitespace from a binary string."""
+        return ''.join(bits_str.split())
+
+
+def _parse(line, _match=_BINARY_TAG.match):
     """Extract binary bytes and optional label from a comment line."""
-    m = _BINARY_TAG.match(line.strip())
+    if '#binary:' not in line:   # cheap reject before the regex engine
+        return None, None
+    m = _match(line) or _match(line.strip())
     if m:
-        bits = m.group(1).strip()
+        bits = _clean(m.group(1))
         label = m.group(2).strip() if m.group(2) else None
         return bits, label
     return None, None
 
 
+def _parse_many(lines, _match=_BINARY_TAG.match):
+    """Yield (bits, label) for every #binary: line in an iterable of lines."""
+    for line in lines:
+        if '#binary:' not in line:
+            continue
+        m = _match(line) or _match(line.strip())
+        if m:
+            label = m.group(2)
+            yield _clean(m.group(1)), label.strip() if label else None
+
+
+# Whole-source scanner: one finditer() pass over the text instead of a _parse()
+# call per line (None on MicroPython, whose re lacks MULTILINE and finditer)
+try:
+    _BINARY_SCAN = re.compile(
+        r"^[ \t]*#[ \t]*#binary:[ \t]*([01 \t]+)(?::[ \t]*([^\n]*))?",
+        re.ASCII | re.MULTILINE,
+    )
+except AttributeError:
+    _BINARY_SCAN = None
+
+
+def scan_source(text):
+    """
+    Yield (bits, label) for every #binary: directive in a source string.
+
+    Args:
+        text : full source text (e.g. the contents of a .py file)
+
+    Yields:
+        (bits: str, label: str | None) — bits with whitespace removed
+    """
+    if _BINARY_SCAN is None:
+        yield from _parse_many(text.splitlines())
+        return
+    for m in _BINARY_SCAN.finditer(text):
+        label = m.group(2)
+        label = label.strip() if label else None
+        yield _clean(m.group(1)), label or None
+
+
 def _validate_bits(bits_str):
     """
     Validate that a binary string contains only '0', '1', and whitespace.
@@ -35,7 +97,7 @@ def _validate_bits(bits_str):
     Returns:
         (is_valid: bool, error_msg: str | None)
     """
-    clean = bits_str.replace(' ', '').replace('\t', '')
+    clean = _clean(bits_str)
     if not clean:
         return False, "Empty binary string"
     if any(c not in '01' for c in clean):
@@ -45,7 +107,7 @@ def _validate_bits(bits_str):
     return True, None
 
 
-def to_int(bits_str, signed=False):
+def to_int(bits_str, signed=False, _already_clean=False):
     """
     Convert a binary string to an integer.
 
@@ -56,7 +118,7 @@ def to_int(bits_str, signed=False):
     Returns:
         int
     """
-    clean = bits_str.replace(' ', '').replace('\t', '')
+    clean = bits_str if _already_clean else _clean(bits_str)
     if not clean:
         return 0
 
@@ -71,7 +133,7 @@ def to_int(bits_str, signed=False):
     return value
 
 
-def to_hex(bits_str, prefix=True):
+def to_hex(bits_str, prefix=True, _already_clean=False):
     """
     Convert a binary string to hexadecimal representation.
 
@@ -82,12 +144,12 @@ def to_hex(bits_str, prefix=True):
     Returns:
         str (hex representation)
     """
-    val = to_int(bits_str, signed=False)
+    val = to_int(bits_str, signed=False, _already_clean=_already_clean)
     hex_str = hex(val) if prefix else hex(val)[2:]
     return hex_str
 
 
-def to_bytes(bits_str, byteorder=None):
+def to_bytes(bits_str, byteorder=None, _already_clean=False):
     """
     Convert a binary string to a bytes object.
 
@@ -101,8 +163,9 @@ def to_bytes(bits_str, byteorder=None):
     if byteorder is None:
         byteorder = _endianness
 
-    val = to_int(bits_str, signed=False)
-    byte_len = (len(bits_str.replace(' ', '').replace('\t', '')) + 7) // 8
+    clean = bits_str if _already_clean else _clean(bits_str)
+    val = to_int(clean, signed=False, _already_clean=True)
+    byte_len = (len(clean) + 7) // 8
     return val.to_bytes(byte_len, byteorder=byteorder)
 
 
@@ -117,7 +180,8 @@ def from_int(value, bit_width=8):
     Returns:
         str (binary representation, e.g. '00001010')
     """
-    return format(value & ((1 << bit_width) - 1), f'0{bit_width}b')
+    # bin() + zfill() skips building and parsing a format spec on every call
+    return bin(value & ((1 << bit_width) - 1))[2:].zfill(bit_width)
 
 
 def from_bytes(byte_data, byteorder=None):
@@ -136,7 +200,7 @@ def from_bytes(byte_data, byteorder=None):
 
     val = int.from_bytes(byte_data, byteorder=byteorder)
     bit_width = len(byte_data) * 8
-    bits = format(val, f'0{bit_width}b')
+    bits = bin(val)[2:].zfill(bit_width)
 
     # Space-separate into bytes for readability
     return ' '.join(bits[i:i+8] for i in range(0, len(bits), 8))
@@ -153,7 +217,7 @@ def set_endianness(order):
     if order not in ('big', 'little'):
         raise ValueError(f"[DYTX:binary] Invalid endianness '{order}'. Choose 'big' or 'little'.")
     _endianness = order
-    print(f"[DYTX:binary] Endianness set to '{order}'")
+    _emit(_PREFIX, "Endianness set to '%s'", order)
 
 
 def get_endianness():
@@ -161,6 +225,26 @@ def get_endianness():
     return _endianness
 
 
+def set_quiet(value=True):
+    """
+    Enable/disable quiet mode.
+    When quiet, exec_comment() does not print per directive; the echo lines
+    are held in memory and written in a single stdout write at flush()/report().
+    This defers output; dytx.set_verbose(False) / DYTX_QUIET suppresses it.
+    """
+    global _quiet
+    _quiet = bool(value)
+    if not _quiet:
+        _drain_quiet()
+
+
+def _drain_quiet():
+    """Write held quiet-mode lines to stdout in one call."""
+    if _quiet_lines:
+        sys.stdout.write("\n".join(_quiet_lines) + "\n")
+        _quiet_lines.clear()
+
+
 def exec_comment(label, bits=None):
     """
     Execute the binary directive associated with the given label.
@@ -170,7 +254,8 @@ def exec_comment(label, bits=None):
         label : string label to match (e.g. 'NOP', 'BITMASK_ALL')
         bits  : optional binary string override (if not scanning from source)
     """
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
 
     if bits is not None:
@@ -178,30 +263,61 @@ def exec_comment(label, bits=None):
         if not valid:
             print(f"[DYTX:binary] ERROR: {err}")
             return
-        _buffer[label] = bits
+        clean = _clean(bits)
+        _buffer[label] = (clean, int(clean, 2))
 
     _exec_count += 1
-    print(f"[DYTX:binary] Executed binary directive for '{label}'")
+    if _state.verbose:
+        if _quiet:
+            _quiet_lines.append(_PREFIX + " Executed binary directive for '" + str(label) + "'")
+        else:
+            print(_PREFIX, " Executed binary directive for '", label, "'", sep='')
+
 
+def flush(source=None):
+    """
+    Flush any pending binary directives.
 
-def flush():
-    """Flush any pending binary directives."""
-    _check_init()
+    Args:
+        source : optional source text; every #binary: directive found in it
+                 (via scan_source) is flushed along with the buffer
+    """
+    if not _state.initialized:
+        _check_init()
     global _exec_count
     count = len(_buffer)
+    if source is not None:
+        for _ in scan_source(source):
+            count += 1
     _exec_count += count
+    _drain_quiet()
     if count:
-        print(f"[DYTX:binary] Flushed {count} binary directive(s)")
+        _emit(_PREFIX, "Flushed %d binary directive(s)", count)
     _buffer.clear()
 
 
 def get_buffer():
-    """Return the current buffer of binary directives as a dict {label: bits_str}."""
-    return dict(_buffer)
+    """Return the current buffer of binary directives as a dict {label: bits_str} (whitespace removed)."""
+    return {label: entry[0] for label, entry in _buffer.items()}
+
+
+def get_buffer_int(label):
+    """
+    Return the integer value of a buffered binary directive without re-parsing it.
+
+    Args:
+        label : directive label passed to exec_comment()
+
+    Returns:
+        int, or None if the label is not buffered
+    """
+    entry = _buffer.get(label)
+    return entry[1] if entry is not None else None
 
 
 def report():
     """Print session binary execution summary."""
+    _drain_quiet()
     print(f"[DYTX:binary] Session report: {_exec_count} binary directive(s) executed. | endianness={_endianness}")
 
 
@@ -209,36 +325,68 @@ def reset():
     """Reset binary engine state."""
     global _buffer, _exec_count
     _buffer.clear()
+    _quiet_lines.clear()
     _exec_count = 0
-    print("[DYTX:binary] Reset complete.")
+    _emit(_PREFIX, "Reset complete.")
 
 
 # ── Utility: bitwise operations ────────────────────────────────────────────────────
+# Int variants: chained operations stay in ints and format once at the end, e.g.
+#   from_int(and_int(xor_int(a, b), mask), bit_width=8)
+# instead of bitwise_and(bitwise_xor(a, b), mask), which formats and re-parses
+# a binary string per step. The string functions below wrap these.
+def and_int(a, b):
+    """Bitwise AND of two ints."""
+    return a & b
+
+
+def or_int(a, b):
+    """Bitwise OR of two ints."""
+    return a | b
+
+
+def xor_int(a, b):
+    """Bitwise XOR of two ints."""
+    return a ^ b
+
+
+def not_int(value, width):
+    """
+    Bitwise NOT of an int within a fixed bit width.
+
+    Args:
+        value : int
+        width : bit width of the result
+
+    Returns:
+        int in range(0, 1 << width)
+    """
+    return (value ^ ((1 << width) - 1)) & ((1 << width) - 1)
+
+
+def _operands(bits_a, bits_b):
+    """Clean and parse two binary strings once: (a: int, b: int, width of the wider input)."""
+    a = _clean(bits_a)
+    b = _clean(bits_b)
+    return to_int(a, _already_clean=True), to_int(b, _already_clean=True), max(len(a), len(b))
+
+
 def bitwise_and(bits_a, bits_b):
     """Perform bitwise AND on two binary strings of equal length."""
-    a = to_int(bits_a)
-    b = to_int(bits_b)
-    result = a & b
-    width = max(len(bits_a.replace(' ', '')), len(bits_b.replace(' ', '')))
-    return from_int(result, bit_width=width)
+    a, b, width = _operands(bits_a, bits_b)
+    return from_int(and_int(a, b), bit_width=width)
 
 
 def bitwise_or(bits_a, bits_b):
     """Perform bitwise OR on two binary strings of equal length."""
-    a = to_int(bits_a)
-    b = to_int(bits_b)
-    result = a | b
-    width = max(len(bits_a.replace(' ', '')), len(bits_b.replace(' ', '')))
-    return from_int(result, bit_width=width)
+    a, b, width = _operands(bits_a, bits_b)
+    return from_int(or_int(a, b), bit_width=width)
 
 
 def bitwise_xor(bits_a, bits_b):
     """Perform bitwise XOR on two binary strings of equal length."""
-    a = to_int(bits_a)
-    b = to_int(bits_b)
-    result = a ^ b
-    width = max(len(bits_a.replace(' ', '')), len(bits_b.replace(' ', '')))
-    return from_int(result, bit_width=width)
+    a, b, width = _operands(bits_a, bits_b)
+    return from_int(xor_int(a, b), bit_width=width)
 
 
 def bitwise_not(bits, width=None):
@@ -252,15 +400,23 @@ def bitwise_not(bits, width=None):
     Returns:
         binary string (inverted)
     """
+    clean = _clean(bits)
     if width is None:
-        width = len(bits.replace(' ', '').replace('\t', ''))
-    val = to_int(bits)
-    mask = (1 << width) - 1
-    result = val ^ mask
-    return from_int(result, bit_width=width)
+        width = len(clean)
+    return from_int(not_int(to_int(clean, _already_clean=True), width), bit_width=width)
 
 
 # ── Advanced: checksum / parity utilities (future expansion) ─────────────────────────────
+# Population count on ints: int.bit_count() is one C call (CPython 3.10+);
+# older CPython and MicroPython fall back to counting '1's in bin()
+if hasattr(0, 'bit_count'):
+    def _popcount(value):
+        return value.bit_count()
+else:
+    def _popcount(value):
+        return bin(value).count('1')
+
+
 def parity(bits_str):
     """
     Calculate even parity bit (1 if odd number of 1s, else 0).
@@ -269,11 +425,13 @@ def parity(bits_str):
         bits_str : binary string (e.g. '10101010')
 
     Returns:
-        int (0 or 1)
+        int (0 or 1) — for a non-binary string, the parity of its '1' characters
     """
-    clean = bits_str.replace(' ', '').replace('\t', '')
-    ones = clean.count('1')
-    return ones % 2
+    clean = _clean(bits_str)
+    try:
+        return _popcount(int(clean, 2)) & 1
+    except ValueError:  # not binary (e.g. '10x1') or empty: count the '1's as before
+        return clean.count('1') & 1
 
 
 def hamming_distance(bits_a, bits_b):
@@ -286,5 +444,4 @@ def hamming_distance(bits_a, bits_b):
     Returns:
         int (distance)
     """
-    xor_result = bitwise_xor(bits_a, bits_b)
-    return xor_result.count('1')
+    return _popcount(xor_int(to_int(bits_a), to_int(bits_b)))
@@ -2,57 +2,122 @@
 # DYTX Firmware Sub-Engine v2.0
 # Parses //firmware: blocks and compiles them to target firmware.
 
-import re
-import inspect
-from dytx import _check_init
+import sys
+from dytx import _state, _check_init, _iter_lines, _emit
+
+try:
+    from types import MappingProxyType as _ReadOnly
+except ImportError:  # MicroPython: no MappingProxyType, hand out a shallow copy
+    _ReadOnly = dict
 
 # ── State ─────────────────────────────────────────────────────────────────────────
 _exec_count = 0
-_FIRMWARE_TAG = re.compile(r"//firmware:(\w+)")
+_PREFIX = "[DYTX:firmware]"
+_FIRMWARE_TAG = "//firmware:"   # block opener, e.g. '//firmware:c++' or '# //firmware:c++' (substring test, no regex)
 _compiled_blocks = {}  # {target: [code_strings]}
-_VALID_TARGETS = ('c++', 'rp2040', 'avr', 'esp32', 'esp8266', 'stm32', 'nrf52')
+_VALID_TARGETS_ORDERED = ('c++', 'rp2040', 'avr', 'esp32', 'esp8266', 'stm32', 'nrf52')
+_VALID_TARGETS = frozenset(_VALID_TARGETS_ORDERED)
+_block_cache = {}      # {fn: (docstring, extracted block)}
+
+
+def _opens_block(line):
+    """
+    True if line holds a '//firmware:<target>' tag anywhere (bare, in the
+    '# //firmware:c++' comment form, or after other text), as the original
+    //firmware:(\w+) search did: the tag must be followed by a word character.
+    """
+    n = len(_FIRMWARE_TAG)
+    i = line.find(_FIRMWARE_TAG)
+    while i >= 0:
+        c = line[i + n:i + n + 1]
+        if c.isalnum() or c == '_':
+            return True
+        i = line.find(_FIRMWARE_TAG, i + 1)
+    return False
 
 
 def _extract_block(fn):
-    """Extract firmware docstring block from function."""
-    doc = inspect.getdoc(fn) or ""
-    lines = []
+    """
+    Extract firmware docstring block from function.
+    Reads fn.__doc__ directly (no inspect import) and dedents the body lines
+    the way inspect.getdoc() does; the result is cached per function and
+    reused while fn.__doc__ is the same object (repeated compile_block() calls
+    across targets are a dict lookup).
+    """
+    doc = fn.__doc__
+    cached = _block_cache.get(fn)
+    if cached is not None and cached[0] is doc:
+        return cached[1]
+
+    text = doc or ""
+    if '\t' in text:
+        text = text.expandtabs()
+
+    # Two streaming passes (margin, then extract): only the block's own lines are kept
+    margin = None
+    lines = _iter_lines(text)
+    next(lines, None)                       # first line does not count toward the margin
+    for line in lines:
+        content = line.lstrip()
+        if content:
+            indent = len(line) - len(content)
+            if margin is None or indent < margin:
+                margin = indent
+    margin = margin or 0
+
+    body = []
     inside = False
-    for line in doc.splitlines():
-        if _FIRMWARE_TAG.search(line):
+    first = True
+    for line in _iter_lines(text):
+        if first:
+            line = line.lstrip()
+            first = False
+        else:
+            line = line[margin:]
+        if _opens_block(line):
             inside = True
             continue
         if inside:
-            lines.append(line)
-    return " ".join(lines).strip()
+            body.append(line)
+    block = " ".join(body).strip()
+    _block_cache[fn] = (doc, block)
+    return block
+
+
+def _store(target, code):
+    """Append code to its target's block list (one dict lookup once the target exists)."""
+    try:
+        _compiled_blocks[target].append(code)
+    except KeyError:
+        _compiled_blocks[target] = [code]
 
 
 def compile_block(fn, target="c++"):
     """Compile firmware block from function docstring."""
     global _exec_count
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     if target not in _VALID_TARGETS:
         print(f"[DYTX:firmware] WARNING: Unknown target {target}")
+    if not getattr(fn, '__doc__', None):   # no docstring → no block; skip extraction and caching
+        return ""
     code = _extract_block(fn)
     if not code:
         return ""
-    if target not in _compiled_blocks:
-        _compiled_blocks[target] = []
-    _compiled_blocks[target].append(code)
+    _store(target, code)
     _exec_count += 1
-    print(f"[DYTX:firmware] Compiled block for {target}")
+    _emit(_PREFIX, "Compiled block for %s", target)
     return code
 
 
 def compile_string(code, target='c++'):
     """Compile code string directly."""
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
-    if target not in _compiled_blocks:
-        _compiled_blocks[target] = []
-    _compiled_blocks[target].append(code)
+    _store(target, code)
     _exec_count += 1
-    print(f"[DYTX:firmware] Compiled string for {target}")
+    _emit(_PREFIX, "Compiled string for %s", target)
     return code
 
 
@@ -64,16 +129,41 @@ def directive(name, *args):
         name : directive name string (e.g. 'INIT_FRAMEBUFFER', 'SWAP_BUFFERS')
         *args: optional directive arguments
     """
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
-    arg_str = ', '.join(str(a) for a in args)
-    print(f"[DYTX:firmware] directive {name}({arg_str})")
+    if _state.verbose:
+        if not args:
+            arg_str = ''
+        elif len(args) == 1:
+            arg_str = str(args[0])
+        else:
+            arg_str = ', '.join(map(str, args))   # map() runs in C, no generator frame
+        _emit(_PREFIX, "directive %s(%s)", name, arg_str)
     _exec_count += 1
 
 
+def get_compiled(target=None):
+    """
+    Return compiled firmware blocks without copying them.
+
+    Args:
+        target : target name, or None for every target
+
+    Returns:
+        target=None : read-only live view {target: [code_strings]}
+        target=str  : that target's list of code strings (() if none) — treat as read-only
+    """
+    if target is None:
+        return _ReadOnly(_compiled_blocks)
+    return _compiled_blocks.get(target, ())
+
+
 def report():
-    """Summary report."""
-    print(f"[DYTX:firmware] Session: {_exec_count} blocks compiled.")
+    """Summary report, with a per-target block count (one stdout write)."""
+    lines = [f"[DYTX:firmware] Session: {_exec_count} blocks compiled."]
+    lines.extend(f"[DYTX:firmware]   {target}: {len(blocks)} block(s)" for target, blocks in _compiled_blocks.items())
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def reset():
@@ -81,4 +171,5 @@ def reset():
     global _exec_count, _compiled_blocks
     _exec_count = 0
     _compiled_blocks.clear()
-    print("[DYTX:firmware] Reset complete.")
+    _block_cache.clear()
+    _emit(_PREFIX, "Reset complete.")
@@ -3,120 +3,180 @@
 # Parses #machine: comment directives and simulates MCU register access.
 
 import re
+import struct
+import sys
+from array import array
 from typing import Any
-from dytx import _check_init
+from dytx import _state, _check_init, _emit
 
 # ── State ─────────────────────────────────────────────────────────────────────
 _buffer: list[str] = []
 _exec_count: int = 0
-_MACHINE_TAG = re.compile(r"#\s*#machine:\s*(.+)")
-
-# Simulated register file (ARM Cortex-M style)
-_registers: dict[str, int] = {f'R{i}': 0 for i in range(16)}
-_registers['SP'] = 0x20000000  # R13 - stack pointer
-_registers['LR'] = 0           # R14 - link register
-_registers['PC'] = 0           # R15 - program counter
-
-# Simulated memory (dict: address -> value)
-_memory: dict[int, int] = {}
-
-# Peripheral register addresses (RP2040 / Generic ARM)
-_PERIPHERALS = {
-    'GPIO_OUT': 0x40014000,
-    'GPIO_IN':  0x40014004,
-    'GPIO_DIR': 0x40014008,
-    'UART_DR':  0x40034000,
-    'UART_FR':  0x40034018,
-    'SPI_DR':   0x40040000,
-    'I2C_DAT':  0x40044000,
-}
-
-def _parse(line: str) -> str | None:
+# re.ASCII: byte-class \s matching (MicroPython's re has no flags → 0)
+_MACHINE_TAG = re.compile(r"#\s*#machine:\s*(.*\S)", getattr(re, 'ASCII', 0))
+_PREFIX = "[DYTX:machine]"   # progress output: _emit(_PREFIX, fmt, *args) formats only when enabled
+
+# Simulated register file (ARM Cortex-M style): one flat 32-bit array,
+# indexed through _REGIDX (name -> slot) instead of a dict of boxed ints
+_REGIDX: dict[str, int] = {f'R{i}': i for i in range(16)}
+_REGIDX['SP'] = 16  # R13 - stack pointer
+_REGIDX['LR'] = 17  # R14 - link register
+_REGIDX['PC'] = 18  # R15 - program counter
+_REGNAMES = tuple(_REGIDX)   # slot -> canonical (upper-case) name
+_SP_RESET = 0x20000000
+_regs = array('I', [0] * len(_REGIDX))
+_regs[_REGIDX['SP']] = _SP_RESET
+
+# Simulated memory: byte-addressed, little-endian (as on Cortex-M), held in
+# 4 KiB bytearray pages keyed by address >> 12 and allocated on first write
+_PAGE_SHIFT = 12
+_PAGE = 1 << _PAGE_SHIFT      # 4096
+_pages: dict[int, bytearray] = {}
+
+class Periph:
+    """
+    Peripheral register addresses (RP2040 / Generic ARM) as int constants,
+    e.g. Periph.GPIO_OUT. Passing one to read_peripheral()/write_peripheral()
+    skips the name lookup.
+    (A plain class rather than IntEnum: MicroPython has no enum module.)
+    """
+    GPIO_OUT = 0x40014000
+    GPIO_IN  = 0x40014004
+    GPIO_DIR = 0x40014008
+    UART_DR  = 0x40034000
+    UART_FR  = 0x40034018
+    SPI_DR   = 0x40040000
+    I2C_DAT  = 0x40044000
+
+# Name -> address, for the string form of read_peripheral()/write_peripheral()
+# (dir() rather than __dict__: MicroPython classes may not expose __dict__)
+_PERIPHERALS: dict[str, int] = {name: getattr(Periph, name) for name in dir(Periph) if name.isupper()}
+
+def _parse(line: str, _match=_MACHINE_TAG.match) -> str | None:
     """Extract machine directive from a comment line."""
-    m = _MACHINE_TAG.match(line.strip())
-    return m.group(1).strip() if m else None
+    if '#machine:' not in line:   # cheap reject before strip() and the regex engine
+        return None
+    m = _match(line.strip())
+    # '\s*' eats the gap after the tag and '(.*\S)' ends on a non-space: group(1) is already trimmed
+    return m.group(1) if m else None
+
+def _reg_index(reg: str) -> int | None:
+    """Register slot for a name; canonical 'R0'/'SP' hit directly, .upper() only for other spellings."""
+    idx = _REGIDX.get(reg)
+    if idx is None:
+        idx = _REGIDX.get(reg.upper())
+    return idx
 
 def read_register(reg: str) -> int:
     """Read a simulated ARM register value."""
-    reg = reg.upper()
-    if reg not in _registers:
-        print(f"[DYTX:machine] WARNING: Unknown register '{reg}'")
+    idx = _reg_index(reg)
+    if idx is None:
+        print(f"[DYTX:machine] WARNING: Unknown register '{reg.upper()}'")
         return 0
-    return _registers[reg]
+    return _regs[idx]
 
 def write_register(reg: str, value: int):
     """Write to a simulated ARM register."""
-    reg = reg.upper()
-    if reg not in _registers:
-        print(f"[DYTX:machine] WARNING: Unknown register '{reg}'")
+    idx = _reg_index(reg)
+    if idx is None:
+        print(f"[DYTX:machine] WARNING: Unknown register '{reg.upper()}'")
         return
-    _registers[reg] = value & 0xFFFFFFFF
-    print(f"[DYTX:machine] {reg} ← 0x{value:08X}")
+    _regs[idx] = value & 0xFFFFFFFF   # array('I') rejects negatives / >32-bit, so the mask stays
+    _emit(_PREFIX, "%s ← 0x%08X", _REGNAMES[idx], value)
 
 def read_memory(address: int) -> int:
     """Read a 32-bit word from simulated memory."""
-    return _memory.get(address, 0)
+    offset = address & (_PAGE - 1)
+    if offset <= _PAGE - 4:
+        page = _pages.get(address >> _PAGE_SHIFT)
+        return struct.unpack_from('<I', page, offset)[0] if page is not None else 0
+    # Word straddles two pages: assemble it byte by byte
+    value = 0
+    for i in range(4):
+        page = _pages.get((address + i) >> _PAGE_SHIFT)
+        if page is not None:
+            value |= page[(address + i) & (_PAGE - 1)] << (8 * i)
+    return value
 
 def write_memory(address: int, value: int):
     """Write a 32-bit word to simulated memory."""
-    _memory[address] = value & 0xFFFFFFFF
-    print(f"[DYTX:machine] MEM[0x{address:08X}] ← 0x{value:08X}")
-
-def read_peripheral(name: str) -> int:
-    """Read from a named peripheral register."""
-    if name not in _PERIPHERALS:
+    value &= 0xFFFFFFFF
+    offset = address & (_PAGE - 1)
+    if offset <= _PAGE - 4:
+        page = _pages.get(address >> _PAGE_SHIFT)
+        if page is None:
+            page = _pages[address >> _PAGE_SHIFT] = bytearray(_PAGE)
+        struct.pack_into('<I', page, offset, value)
+    else:
+        # Word straddles two pages: store it byte by byte
+        for i in range(4):
+            page = _pages.get((address + i) >> _PAGE_SHIFT)
+            if page is None:
+                page = _pages[(address + i) >> _PAGE_SHIFT] = bytearray(_PAGE)
+            page[(address + i) & (_PAGE - 1)] = (value >> (8 * i)) & 0xFF
+    _emit(_PREFIX, "MEM[0x%08X] ← 0x%08X", address, value)
+
+def read_peripheral(name: str | int) -> int:
+    """Read from a peripheral register, by name ('GPIO_OUT') or address (Periph.GPIO_OUT)."""
+    if isinstance(name, int):
+        return read_memory(name)
+    address = _PERIPHERALS.get(name)
+    if address is None:
         print(f"[DYTX:machine] WARNING: Unknown peripheral '{name}'")
         return 0
-    return read_memory(_PERIPHERALS[name])
+    return read_memory(address)
 
-def write_peripheral(name: str, value: int):
-    """Write to a named peripheral register."""
-    if name not in _PERIPHERALS:
+def write_peripheral(name: str | int, value: int):
+    """Write to a peripheral register, by name ('GPIO_OUT') or address (Periph.GPIO_OUT)."""
+    if isinstance(name, int):
+        write_memory(name, value)
+        return
+    address = _PERIPHERALS.get(name)
+    if address is None:
         print(f"[DYTX:machine] WARNING: Unknown peripheral '{name}'")
         return
-    write_memory(_PERIPHERALS[name], value)
+    write_memory(address, value)
 
 def get_register_map() -> dict[str, int]:
     """Return a copy of the current register state."""
-    return dict(_registers)
+    return {reg: _regs[idx] for reg, idx in _REGIDX.items()}
 
 def dump_registers():
-    """Print all register values in a formatted table."""
-    print("=" * 40)
-    print("      DYTX Machine Register Dump")
-    print("=" * 40)
-    for i in range(13):
-        print(f" R{i:<2} = 0x{_registers[f'R{i}']:08X}")
-    print(f" SP  = 0x{_registers['SP']:08X}")
-    print(f" LR  = 0x{_registers['LR']:08X}")
-    print(f" PC  = 0x{_registers['PC']:08X}")
-    print("=" * 40)
+    """Print all register values in a formatted table (one stdout write)."""
+    out = ["=" * 40, "      DYTX Machine Register Dump", "=" * 40]
+    out.extend(f" R{i:<2} = 0x{_regs[i]:08X}" for i in range(13))
+    out.append(f" SP  = 0x{_regs[16]:08X}")
+    out.append(f" LR  = 0x{_regs[17]:08X}")
+    out.append(f" PC  = 0x{_regs[18]:08X}")
+    out.append("=" * 40)
+    sys.stdout.write("\n".join(out) + "\n")
 
 def dump_memory(start: int = 0x20000000, count: int = 16):
-    """Print a memory dump."""
-    print(f"
-[DYTX:machine] Memory dump from 0x{start:08X}:")
+    """Print a memory dump (one stdout write)."""
+    out = [f"\n[DYTX:machine] Memory dump from 0x{start:08X}:"]
     for i in range(count):
         addr = start + (i * 4)
-        val = read_memory(addr)
-        print(f"  0x{addr:08X}: 0x{val:08X}")
+        out.append(f"  0x{addr:08X}: 0x{read_memory(addr):08X}")
+    sys.stdout.write("\n".join(out) + "\n")
 
 def flush():
     """Flush the machine code comment buffer."""
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
     count = len(_buffer)
     _exec_count += count
     if count:
-        print(f"[DYTX:machine] Executed {count} machine directive(s) OK")
+        _emit(_PREFIX, "Executed %d machine directive(s) OK", count)
     _buffer.clear()
 
 def exec_directive(directive: str):
     """Execute a single machine directive string."""
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
     _exec_count += 1
-    print(f"[DYTX:machine] >> {directive}")
+    _emit(_PREFIX, ">> %s", directive)
 
 def report():
     """Print a summary report."""
@@ -124,24 +184,39 @@ def report():
 
 def reset():
     """Reset execution state."""
-    global _exec_count, _registers, _memory
+    global _exec_count
     _exec_count = 0
-    for key in _registers: _registers[key] = 0
-    _registers['SP'] = 0x20000000
-    _memory.clear()
-    print("[DYTX:machine] Reset complete.")
+    for i in range(len(_regs)): _regs[i] = 0
+    _regs[_REGIDX['SP']] = _SP_RESET
+    _pages.clear()
+    _emit(_PREFIX, "Reset complete.")
 
 # ── Instruction Simulation ───────────────────────────────────────────────────
 
+# Parsed '#imm' operands ('#42' -> 42); cleared when full so it stays bounded
+_IMM_CACHE: dict[str, int] = {}
+_IMM_CACHE_MAX = 1024
+
+def _parse_imm(op: str) -> int:
+    """Decode an immediate operand such as '#42' or '#0x10' (0 if malformed), memoized."""
+    value = _IMM_CACHE.get(op)
+    if value is None:
+        try: value = int(op[1:], 0)
+        except ValueError: value = 0
+        if len(_IMM_CACHE) >= _IMM_CACHE_MAX:
+            _IMM_CACHE.clear()
+        _IMM_CACHE[op] = value
+    return value
+
 def _resolve_val(op: Any) -> int:
     if isinstance(op, int): return op
     if isinstance(op, str):
         op = op.strip()
-        if op.startswith('#'):
-            try: return int(op[1:], 0)
-            except ValueError: return 0
-        if op.upper() in _registers:
-            return read_register(op)
+        if op[:1] == '#':
+            return _parse_imm(op)
+        idx = _reg_index(op)
+        if idx is not None:
+            return _regs[idx]
     return 0
 
 def simulate_mov(dest: str, src: Any):
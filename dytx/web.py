@@ -3,31 +3,79 @@
 # Parses #html: and #javascript: (and #css:) docstring directives and generates output files.
 # Integrated with MicroPython WebREPL / web server support.
 
-import re
-import inspect
 import os
-from dytx import _check_init
+import re
+import sys
+from dytx import _state, _check_init, _emit
 
 # ── State ──────────────────────────────────────────────────────────────────────
 _exec_count = 0
-_HTML_TAG = re.compile(r"^#\s*#html:\s*(.*)")
-_JS_TAG   = re.compile(r"^#\s*#javascript:\s*(.*)")
-_CSS_TAG  = re.compile(r"^#\s*#css:\s*(.*)")
+_PREFIX = "[DYTX:web]"
+# Directive prefixes (plain str.startswith tests, no regex)
+_HTML_TAG = "#html:"
+_JS_TAG   = "#javascript:"
+_CSS_TAG  = "#css:"
 
-_html_lines = []
-_js_lines   = []
-_css_lines  = []
+# Accumulated output: one text chunk per compile()/compile_string() call,
+# joined with "\n" only when the output is read or written
+_html_chunks = []
+_js_chunks   = []
+_css_chunks  = []
 
+_doc_cache = {}    # {fn: (docstring, ((code, chunk), ...) per html/js/css)} — see _extract_cached
 
-def _extract_web_lines(fn, tag_re):
-    """Pull tagged lines from a function's docstring."""
-    doc = inspect.getdoc(fn) or ""
-    lines = []
+
+def _extract_web_lines(fn):
+    """
+    Pull the #html:, #javascript: and #css: lines from a function's docstring
+    in a single pass. Accepts both '#html: ...' (docstring form) and
+    '# #html: ...' (comment form). Every line is stripped, so fn.__doc__ is
+    read without inspect.getdoc's dedent; tabs are still expanded and lines
+    split with splitlines() as before (the result is cached per function, so
+    the list is built once). A tag with nothing after it (e.g. '# #html:')
+    contributes an empty line, as it always has.
+
+    Returns:
+        tuple (html_lines: list, js_lines: list, css_lines: list)
+    """
+    html, js, css = [], [], []
+    tags = ((_HTML_TAG, html), (_JS_TAG, js), (_CSS_TAG, css))
+    doc = fn.__doc__ or ""
+    if '\t' in doc:
+        doc = doc.expandtabs()
     for line in doc.splitlines():
-        m = tag_re.match(line.strip())
-        if m:
-            lines.append(m.group(1))
-    return lines
+        s = line.strip()
+        if s[:1] != '#':
+            continue
+        rest = s[1:].lstrip()
+        if rest[:1] == '#':     # comment form: '# #html: ...'
+            s = rest
+        for tag, lines in tags:
+            if s.startswith(tag):
+                lines.append(s[len(tag):].lstrip())
+                break
+    return html, js, css
+
+
+def _extract_cached(fn):
+    """
+    _extract_web_lines() per kind as (code, chunk), cached per function and
+    reused while fn.__doc__ is the same object (live-reload loops recompile
+    the same fn). code is the joined lines compile() returns ("" if none);
+    chunk is code normalised by _chunk() for accumulation, or None when it
+    holds no line at all ("" or a lone bare tag) and adds nothing.
+    """
+    doc = fn.__doc__
+    cached = _doc_cache.get(fn)
+    if cached is not None and cached[0] is doc:
+        return cached[1]
+    parts = []
+    for lines in _extract_web_lines(fn):
+        code = "\n".join(lines)
+        parts.append((code, _chunk(code) if code else None))
+    parts = tuple(parts)
+    _doc_cache[fn] = (doc, parts)
+    return parts
 
 
 def compile(fn, output="output.html"):
@@ -42,20 +90,21 @@ def compile(fn, output="output.html"):
     Returns:
         tuple (html_code: str, js_code: str, css_code: str)
     """
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
 
-    html_code = "\n".join(_extract_web_lines(fn, _HTML_TAG))
-    js_code   = "\n".join(_extract_web_lines(fn, _JS_TAG))
-    css_code  = "\n".join(_extract_web_lines(fn, _CSS_TAG))
-
-    _html_lines.extend(html_code.splitlines())
-    _js_lines.extend(js_code.splitlines())
-    _css_lines.extend(css_code.splitlines())
+    (html_code, html_chunk), (js_code, js_chunk), (css_code, css_chunk) = _extract_cached(fn)
+    if html_chunk is not None:
+        _html_chunks.append(html_chunk)
+    if js_chunk is not None:
+        _js_chunks.append(js_chunk)
+    if css_chunk is not None:
+        _css_chunks.append(css_chunk)
 
     _exec_count += 1
-    print(f"[DYTX:web] Compiled web directives from '{fn.__name__}' → {output}")
-    print(f"[DYTX:web]   HTML: {len(html_code)} chars | JS: {len(js_code)} chars | CSS: {len(css_code)} chars")
+    _emit(_PREFIX, "Compiled web directives from '%s' → %s", fn.__name__, output)
+    _emit(_PREFIX, "  HTML: %d chars | JS: %d chars | CSS: %d chars", len(html_code), len(js_code), len(css_code))
 
     return html_code, js_code, css_code
 
@@ -73,36 +122,51 @@ def compile_string(html="", js="", css="", output="output.html"):
     Returns:
         tuple (html, js, css)
     """
-    _check_init()
+    if not _state.initialized:
+        _check_init()
     global _exec_count
 
     if html:
-        _html_lines.extend(html.splitlines())
+        _html_chunks.append(_chunk(html))
     if js:
-        _js_lines.extend(js.splitlines())
+        _js_chunks.append(_chunk(js))
     if css:
-        _css_lines.extend(css.splitlines())
+        _css_chunks.append(_chunk(css))
 
     _exec_count += 1
-    print(f"[DYTX:web] Compiled strings → {output}")
-    print(f"[DYTX:web]   HTML: {len(html)} chars | JS: {len(js)} chars | CSS: {len(css)} chars")
+    _emit(_PREFIX, "Compiled strings → %s", output)
+    _emit(_PREFIX, "  HTML: %d chars | JS: %d chars | CSS: %d chars", len(html), len(js), len(css))
 
     return html, js, css
 
 
+def _chunk(text):
+    """
+    Normalise a string to one chunk: split with splitlines() (so \r\n, \r and
+    the other line breaks count, and one trailing break is dropped) and rejoin
+    with "\n", so chunks join exactly like the lines they hold.
+    """
+    return "\n".join(text.splitlines())
+
+
+def _line_count(chunks):
+    """Number of lines held in a chunk list."""
+    return sum(chunk.count("\n") + 1 for chunk in chunks)
+
+
 def get_html():
     """Return all accumulated HTML as a single string."""
-    return "\n".join(_html_lines)
+    return "\n".join(_html_chunks)
 
 
 def get_js():
     """Return all accumulated JavaScript as a single string."""
-    return "\n".join(_js_lines)
+    return "\n".join(_js_chunks)
 
 
 def get_css():
     """Return all accumulated CSS as a single string."""
-    return "\n".join(_css_lines)
+    return "\n".join(_css_chunks)
 
 
 def write_file(filename, content, minify=False):
@@ -111,21 +175,48 @@ def write_file(filename, content, minify=False):
 
     Args:
         filename : output file path
-        content  : string content to write
-        minify   : if True, apply basic minification (strip comments, whitespace)
+        content  : str (written UTF-8 encoded) or bytes (written as-is)
+        minify   : if True, apply basic minification (strip comments, whitespace; str only)
 
     Returns:
         bool : True if write succeeded
     """
-    _check_init()
+    return _write_chunks(filename, (content,), minify)
 
-    if minify:
-        content = _minify(content)
 
+def _write_chunks(filename, chunks, minify=False):
+    """
+    Stream accumulated chunks to a file one at a time, so the joined text is
+    never built in RAM. Chunks end on line boundaries: plain output joins them
+    with "\n", minified output minifies each and joins the non-empty ones
+    with " " — the same result as writing/minifying the joined string.
+    The file is opened in binary mode and each chunk encoded to UTF-8 up
+    front: writes go straight to the buffered writer, with no text-layer
+    encoder or newline translation in between ("\n" is written as-is).
+    """
+    if not _state.initialized:
+        _check_init()
+
+    sep = b" " if minify else b"\n"
+    written = 0
+    first = True
     try:
-        with open(filename, 'w') as f:
-            f.write(content)
-        print(f"[DYTX:web] Wrote {len(content)} bytes to '{filename}'")
+        with open(filename, 'wb') as f:
+            for chunk in chunks:
+                if minify:
+                    chunk = _minify(chunk)
+                    if not chunk:
+                        continue
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if first:
+                    first = False
+                else:
+                    f.write(sep)
+                    written += len(sep)
+                f.write(chunk)
+                written += len(chunk)
+        _emit(_PREFIX, "Wrote %d bytes to '%s'", written, filename)
         return True
     except Exception as e:
         print(f"[DYTX:web] ERROR: Failed to write '{filename}': {e}")
@@ -134,17 +225,17 @@ def write_file(filename, content, minify=False):
 
 def write_html(filename="index.html", minify=False):
     """Write accumulated HTML to a file."""
-    return write_file(filename, get_html(), minify=minify)
+    return _write_chunks(filename, _html_chunks, minify)
 
 
 def write_js(filename="script.js", minify=False):
     """Write accumulated JavaScript to a file."""
-    return write_file(filename, get_js(), minify=minify)
+    return _write_chunks(filename, _js_chunks, minify)
 
 
 def write_css(filename="style.css", minify=False):
     """Write accumulated CSS to a file."""
-    return write_file(filename, get_css(), minify=minify)
+    return _write_chunks(filename, _css_chunks, minify)
 
 
 def write_all(html_file="index.html", js_file="script.js", css_file="style.css", minify=False):
@@ -160,10 +251,50 @@ def write_all(html_file="index.html", js_file="script.js", css_file="style.css",
     Returns:
         tuple (html_ok: bool, js_ok: bool, css_ok: bool)
     """
-    html_ok = write_html(html_file, minify=minify)
-    js_ok   = write_js(js_file, minify=minify)
-    css_ok  = write_css(css_file, minify=minify)
-    return html_ok, js_ok, css_ok
+    outputs = ((html_file, _html_chunks), (js_file, _js_chunks), (css_file, _css_chunks))
+    return tuple(_write_chunks(name, chunks, minify) for name, chunks in outputs)
+
+
+def write_bundle(filename="bundle.html", minify=False):
+    """
+    Write HTML, CSS and JS as one self-contained HTML file (a single open()):
+    the CSS is inlined in a <style> and the JS in a <script> just before
+    </body> (appended at the end if the HTML has no </body>).
+
+    Args:
+        filename : output HTML filename
+        minify   : if True, minify the CSS and JS before inlining
+
+    Returns:
+        bool : True if write succeeded
+    """
+    html, css, js = get_html(), get_css(), get_js()
+    if minify:
+        css, js = _minify(css), _minify(js)
+    inline = ""
+    if css:
+        inline += f"<style>{css}</style>\n"
+    if js:
+        inline += f"<script>{js}</script>\n"
+    end = html.rfind("</body>")
+    if end < 0:
+        bundle = f"{html}\n{inline}" if html else inline
+    else:
+        bundle = html[:end] + inline + html[end:]
+    return write_file(filename, bundle)
+
+
+# Whole-blob minifier passes (None on MicroPython, whose re lacks MULTILINE),
+# run after every splitlines() break is normalised to "\n":
+#   '//' comment to end of line; '#' comment unless the line starts with '#'
+#   (indent = any whitespace but "\n", as str.strip() sees it);
+#   line breaks plus surrounding whitespace and blank lines → one space
+try:
+    _SLASH_COMMENT = re.compile(r"//[^\n]*")
+    _HASH_COMMENT = re.compile(r"^([^\S\n]*[^#\s][^#\n]*)#[^\n]*", re.MULTILINE)
+    _LINE_BREAKS = re.compile(r"\s*\n\s*")
+except AttributeError:
+    _HASH_COMMENT = None
 
 
 def _minify(code):
@@ -176,6 +307,12 @@ def _minify(code):
     Returns:
         str : minified code
     """
+    if _HASH_COMMENT is not None:
+        code = "\n".join(code.splitlines())   # \r, \f, \v, \u2028, ... break lines too
+        code = _SLASH_COMMENT.sub('', code)
+        code = _HASH_COMMENT.sub(r'\1', code)
+        return _LINE_BREAKS.sub(' ', code).strip()
+
     # Remove single-line comments (// and #)
     lines = []
     for line in code.splitlines():
@@ -195,21 +332,24 @@ def _minify(code):
 
 
 def report():
-    """Print session web compilation summary."""
-    print(f"[DYTX:web] Session report: {_exec_count} web compilation(s) executed.")
-    print(f"[DYTX:web]   HTML lines: {len(_html_lines)}")
-    print(f"[DYTX:web]   JS lines:   {len(_js_lines)}")
-    print(f"[DYTX:web]   CSS lines:  {len(_css_lines)}")
+    """Print session web compilation summary (one stdout write)."""
+    sys.stdout.write(
+        f"[DYTX:web] Session report: {_exec_count} web compilation(s) executed.\n"
+        f"[DYTX:web]   HTML lines: {_line_count(_html_chunks)}\n"
+        f"[DYTX:web]   JS lines:   {_line_count(_js_chunks)}\n"
+        f"[DYTX:web]   CSS lines:  {_line_count(_css_chunks)}\n"
+    )
 
 
 def reset():
     """Clear web engine state."""
-    global _exec_count, _html_lines, _js_lines, _css_lines
+    global _exec_count
     _exec_count = 0
-    _html_lines.clear()
-    _js_lines.clear()
-    _css_lines.clear()
-    print("[DYTX:web] Reset complete.")
+    _html_chunks.clear()
+    _js_chunks.clear()
+    _css_chunks.clear()
+    _doc_cache.clear()
+    _emit(_PREFIX, "Reset complete.")
 
 
 # ── Advanced: MicroPython WebREPL / HTTP server integration stubs ───────────────────────────
@@ -240,6 +380,10 @@ def webrepl_stub():
     print("[DYTX:web] (WebREPL integration not implemented)")
 
 
+# Injected as-is into every served page: kept pre-minified (one line, no padding)
+_RELOAD_SCRIPT = '<script>setInterval(function(){fetch("/status").catch(()=>location.reload());},2000);</script>'
+
+
 def inject_live_reload(html):
     """
     Inject a simple live-reload script into HTML (for development).
@@ -248,11 +392,10 @@ def inject_live_reload(html):
         html : HTML string
 
     Returns:
-        str : HTML with live-reload script appended
+        str : HTML with live-reload script inserted before the last </body>
+              (appended if there is none)
     """
-    reload_script = '''<script>
-    setInterval(function() { fetch('/status').catch(() => location.reload()); }, 2000);
-</script>'''
-    if '</body>' in html:
-        return html.replace('</body>', reload_script + '\n</body>')
-    return html + '\n' + reload_script
+    end = html.rfind('</body>')    # one scan, from the end where </body> lives
+    if end < 0:
+        return html + '\n' + _RELOAD_SCRIPT
+    return html[:end] + _RELOAD_SCRIPT + '\n' + html[end:]
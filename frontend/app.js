@@ -78,12 +78,41 @@ async function runProof(id) {
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ proof: id }),
     });
-    const data = await r.json();
-    if (data.error) {
-      appendConsole(`❌ Error: ${data.error}`);
-      if (data.output) appendConsole(data.output);
+    if (!r.ok) {
+      const data = await r.json();
+      appendConsole(`❌ Error: ${data.detail || r.statusText}`);
+      return;
+    }
+
+    // Response is NDJSON: {"line": ...} per stdout line, then {"done": true, "error": ...}
+    const reader = r.body.getReader();
+    const decoder = new TextDecoder();
+    let pending = '';
+    let lines = 0;
+    let result = null;
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      pending += decoder.decode(value, { stream: true });
+      let nl;
+      while ((nl = pending.indexOf('\n')) >= 0) {
+        const record = JSON.parse(pending.slice(0, nl));
+        pending = pending.slice(nl + 1);
+        if (record.done) {
+          result = record;
+        } else {
+          appendConsole(record.line);
+          lines += 1;
+        }
+      }
+    }
+
+    if (!result) {
+      appendConsole('❌ Error: output stream ended unexpectedly');
+    } else if (result.error) {
+      appendConsole(`❌ Error: ${result.error}`);
     } else {
-      appendConsole(data.output || '(no output)');
+      if (!lines) appendConsole('(no output)');
       appendConsole(`✅ Proof #${id} complete.`);
       card.classList.add('done');
     }
@@ -2,12 +2,8 @@
 # PolyPi Pure v1.0 — Runs in Thonny IDE (MicroPython) OR standard Python
 # IDE mode: set ide="thonny" for MicroPython, ide="pure" for CPython/fullstack
 
-import sys
 import dytx
-
-# --- Detect environment automatically ---
-_IDE = "thonny" if "thonny" in sys.executable.lower() else "pure"
-_MODE = "micropython" if _IDE == "thonny" else "python"
+from dytx import _IDE, _MODE   # environment detected once by dytx
 
 # Initialize DYTX runtime
 dytx.init(mode=_MODE, ide=_IDE)
@@ -2,14 +2,10 @@
 # PolyPi Pure v1.0 — Thonny/MicroPython (RP2040) OR CPython simulation
 # In pure mode, hardware calls are simulated — no physical board required
 
-import sys
 import dytx
+from dytx import _IDE, _MODE   # environment detected once by dytx
 import time
 
-# --- Detect environment automatically ---
-_IDE = "thonny" if "thonny" in sys.executable.lower() else "pure"
-_MODE = "micropython" if _IDE == "thonny" else "python"
-
 # Initialize PolyPy DYTX runtime
 dytx.init(mode=_MODE, ide=_IDE, target="rp2040" if _IDE == "thonny" else None)
 
@@ -44,13 +40,18 @@ else:
 # #machine: STR R4, [GPIO_BASE, R3] ; write HIGH to GPIO25
 
 print("[PolyPi Pure] Starting LED blink sequence (10 cycles)...")
-for i in range(10):
-    led.value(1)
-    dxb.exec_comment("GPIO25 HIGH")  # DYTX executes the #binary HIGH directive
-    time.sleep(0.5)
-    led.value(0)
-    dxb.exec_comment("GPIO25 LOW")   # DYTX executes the #binary LOW directive
-    time.sleep(0.5)
+# Bind the per-step calls to locals once, so no call in the loop pays for an
+# attribute lookup (a dict lookup on MicroPython)
+_lv = led.value
+_ec = dxb.exec_comment
+_sl = time.sleep
+for _ in range(10):
+    _lv(1)
+    _ec("GPIO25 HIGH")  # DYTX executes the #binary HIGH directive
+    _sl(0.5)
+    _lv(0)
+    _ec("GPIO25 LOW")   # DYTX executes the #binary LOW directive
+    _sl(0.5)
 
 if _IDE == "thonny":
     dxm.flush()  # flush machine code buffer to MicroPython runtime
@@ -2,13 +2,9 @@
 # PolyPi Pure v1.0 — Thonny IDE, MicroPython OR standard Python (fullstack)
 # In pure mode, generates static HTML+JS files directly to disk
 
-import sys
 import os
 import dytx
-
-# --- Detect environment automatically ---
-_IDE = "thonny" if "thonny" in sys.executable.lower() else "pure"
-_MODE = "micropython" if _IDE == "thonny" else "python"
+from dytx import _IDE, _MODE   # environment detected once by dytx
 
 # Initialize DYTX runtime
 dytx.init(mode=_MODE, ide=_IDE)
@@ -2,13 +2,9 @@
 # PolyPi Pure v1.0 — Thonny IDE / MicroPython OR standard Python (fullstack sim)
 # In pure mode, all rendering calls are printed as a text simulation
 
-import sys
 import math
 import dytx
-
-# --- Detect environment automatically ---
-_IDE = "thonny" if "thonny" in sys.executable.lower() else "pure"
-_MODE = "micropython" if _IDE == "thonny" else "python"
+from dytx import _IDE, _MODE   # environment detected once by dytx
 
 # Initialize DYTX runtime
 dytx.init(mode=_MODE, ide=_IDE, target="generic" if _IDE == "thonny" else None)
@@ -24,16 +20,52 @@ if _IDE == "thonny":
         dxm = dxb = dxf = dxa = None
 else:
     class _Stub:
+        # __getattr__ only runs for missing attributes: each simulated call is
+        # built once and stored on the instance, later lookups are plain hits
         def __getattr__(self, name):
-            return lambda *a, **k: print(f"  [sim] {name}({', '.join(str(x) for x in a)})")
-    dxm = dxb = dxf = dxa = _Stub()
+            def sim(*a, **k):
+                print(f"  [sim] {name}({', '.join(map(str, a))})")
+            setattr(self, name, sim)
+            return sim
+    dxm = dxb = dxf = dxa = _Stub()   # one shared instance, one cached function per name
+
+
+# --- Optional vectorised projection (NumPy, plus a Numba kernel if installed) ---
+try:
+    import numpy as np
+except ImportError:  # MicroPython / no NumPy: models carry a vertex count, draw_model stays a stub
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if np is not None and njit is not None:
+    # Explicit signature → compiled at import, not on the first frame.
+    # Serial on purpose: ~1k vertices is too little work for a thread pool, and
+    # the backend runs proofs inside ProcessPoolExecutor workers already.
+    @njit("void(float32[:,::1], float32[:,::1], float32[:,::1])", fastmath=True, cache=True)
+    def _project_kernel(verts, mvp, out):
+        for i in range(verts.shape[0]):
+            x, y, z = verts[i, 0], verts[i, 1], verts[i, 2]
+            w = mvp[3, 0] * x + mvp[3, 1] * y + mvp[3, 2] * z + mvp[3, 3]
+            for r in range(3):
+                out[i, r] = (mvp[r, 0] * x + mvp[r, 1] * y + mvp[r, 2] * z + mvp[r, 3]) / w
+else:  # no Numba (or no NumPy): Renderer.project() uses the matmul path
+    _project_kernel = None
 
 
 # --- Load 3D model via Python ---
 def load_3d_model(filename: str) -> dict:
     """Load a 3D model (simulated in pure mode)."""
     print(f"[PolyPy] Loading model: {filename}")
-    return {"file": filename, "verts": 1024, "polys": 512}
+    if np is not None:
+        # (N, 3) float32, C-contiguous: the layout the projection kernel expects
+        verts = np.random.default_rng(0).uniform(-1.0, 1.0, (1024, 3)).astype(np.float32)
+    else:
+        verts = 1024
+    return {"file": filename, "verts": verts, "polys": 512}
 
 
 class Camera:
@@ -59,6 +91,24 @@ class Renderer:
         self.width = width
         self.height = height
         self.frame = 0
+        # Projection constants are fixed for a fixed-resolution renderer:
+        # computed once here, not on every draw_model() frame
+        self._fov = math.pi / 3
+        self._aspect = width / height
+        self._near, self._far = 0.1, 100.0
+        self._f = 1.0 / math.tan(self._fov / 2)
+        # Per-frame asm directive text depends only on the constants above
+        self._fdiv_msg = "FDIV S8, S9, S10  ; fov=%.3f aspect=%.3f" % (self._fov, self._aspect)
+        self.projected = None   # last frame's projected (N, 3) vertices (NumPy path only)
+        if np is not None:
+            # 4x4 perspective matrix (column vectors, camera looking down +z, w = view z)
+            depth = self._far - self._near
+            self._proj = np.array([
+                [self._f / self._aspect, 0.0, 0.0, 0.0],
+                [0.0, self._f, 0.0, 0.0],
+                [0.0, 0.0, self._far / depth, -self._near * self._far / depth],
+                [0.0, 0.0, 1.0, 0.0],
+            ], dtype=np.float32)
         # #firmware: INIT_FRAMEBUFFER 320 240
         dxf.directive("INIT_FRAMEBUFFER", width, height)
 
@@ -69,15 +119,36 @@ class Renderer:
             print(f"  [sim] frame {self.frame}: framebuffer cleared")
 
     def draw_model(self, model: dict, camera: Camera):
-        # Perspective projection (simplified)
-        fov = math.pi / 3
-        aspect = self.width / self.height
-        near, far = 0.1, 100.0
-        f = 1.0 / math.tan(fov / 2)
+        # Perspective projection (simplified; constants from __init__)
         # #asm: FDIV S8, S9, S10 ; perspective divide
-        dxa.exec(f"FDIV S8, S9, S10  ; fov={fov:.3f} aspect={aspect:.3f}")
+        dxa.exec(self._fdiv_msg)
+        verts = model["verts"]
+        if np is not None and isinstance(verts, np.ndarray):
+            self.projected = self.project(verts, camera)
         if _IDE == "pure":
-            print(f"  [sim] drew {model['polys']} polys | cam_z={camera.z:.3f} | near={near} far={far}")
+            print(f"  [sim] drew {model['polys']} polys | cam_z={camera.z:.3f} | near={self._near} far={self._far}")
+
+    def project(self, verts, camera: Camera):
+        """
+        Project (N, 3) float32 world-space vertices to normalised device coordinates.
+
+        Args:
+            verts  : np.ndarray of shape (N, 3), dtype float32
+            camera : Camera whose position is the view origin
+
+        Returns:
+            np.ndarray (N, 3) float32 — x, y, depth after the perspective divide
+        """
+        # Fold the camera translation into the projection: one 4x4 product per frame
+        mvp = self._proj.copy()
+        mvp[:, 3] -= self._proj[:, :3] @ np.array([camera.x, camera.y, camera.z], dtype=np.float32)
+        if _project_kernel is not None:
+            out = np.empty_like(verts)
+            _project_kernel(np.ascontiguousarray(verts), mvp, out)
+            return out
+        clip = verts @ mvp[:3, :3].T + mvp[:3, 3]
+        w = verts @ mvp[3, :3] + mvp[3, 3]
+        return clip / w[:, None]
 
     def present(self):
         # #firmware: SWAP_BUFFERS
@@ -93,10 +164,13 @@ cam = Camera()
 renderer = Renderer(width=320, height=240)
 
 print("[PolyPi Pure] Starting render loop (5 frames)...")
+# Bind the per-frame methods once: the loop body then makes plain local calls
+_clear, _update = renderer.clear, cam.update
+_draw, _present = renderer.draw_model, renderer.present
 for _ in range(5):
-    renderer.clear()
-    cam.update()
-    renderer.draw_model(model, cam)
-    renderer.present()
+    _clear()
+    _update()
+    _draw(model, cam)
+    _present()
 
 print(f"[PolyPi Pure] Proof of Work #4 complete. {renderer.frame} frames rendered.")